@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react'
+import React, { useState, useEffect, useMemo } from 'react'
 import { Button } from '@/components/ui/button.jsx'
 import { Input } from '@/components/ui/input.jsx'
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card.jsx'
@@ -6,38 +6,120 @@ import { Badge } from '@/components/ui/badge.jsx'
 import { Textarea } from '@/components/ui/textarea.jsx'
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs.jsx'
 import { Search, Upload, Eye, Calendar, ExternalLink, Loader2, Database, TrendingUp } from 'lucide-react'
+import { VirtualGrid } from '@/components/VirtualGrid.jsx'
+import { useAdsQuery, clearAdsCache } from '@/hooks/use-ads-query.js'
+import { useDebouncedValue } from '@/hooks/use-debounced-value.js'
 import './App.css'
 
 const API_BASE_URL = 'http://localhost:5001/api'
 
+const PLATFORMS = ['Facebook', 'Instagram']
+
+// Fixed height of one ad grid row (card plus gap), needed for virtualization
+const AD_ROW_HEIGHT = 232
+
+const formatDate = (dateString) => {
+  if (!dateString) return 'N/A'
+  return new Date(dateString).toLocaleDateString()
+}
+
+const AdCard = ({ ad, pageName }) => (
+  <Card className="h-[216px] overflow-hidden hover:shadow-lg transition-shadow">
+    <CardHeader className="pb-3">
+      <div className="flex justify-between items-start">
+        <div className="min-w-0">
+          <CardTitle className="text-lg truncate">{pageName || ad.page_id}</CardTitle>
+          <CardDescription>Library ID: {ad.library_id}</CardDescription>
+        </div>
+        <div className="flex gap-2">
+          {ad.platforms?.map(platform => (
+            <Badge key={platform} variant="secondary">{platform}</Badge>
+          ))}
+        </div>
+      </div>
+    </CardHeader>
+    <CardContent>
+      <div className="grid grid-cols-3 gap-4">
+        <div className="col-span-2">
+          <p className="text-sm text-gray-600 mb-2 line-clamp-3">{ad.ad_text}</p>
+          <div className="flex items-center gap-4 text-xs text-gray-500">
+            <div className="flex items-center gap-1">
+              <Calendar className="w-3 h-3" />
+              Started: {formatDate(ad.start_date)}
+            </div>
+            {ad.cta && (
+              <Badge variant="outline">{ad.cta}</Badge>
+            )}
+          </div>
+        </div>
+        <div className="flex justify-center items-center">
+          {ad.media_url ? (
+            <div className="relative">
+              <img 
+                src={ad.media_url} 
+                alt="Ad creative" 
+                loading="lazy"
+                className="w-24 h-24 object-cover rounded-lg"
+                onError={(e) => {
+                  e.target.style.display = 'none'
+                }}
+              />
+              <Badge className="absolute -top-1 -right-1 text-xs">
+                {ad.media_type}
+              </Badge>
+            </div>
+          ) : (
+            <div className="w-24 h-24 bg-gray-100 rounded-lg flex items-center justify-center">
+              <Eye className="w-6 h-6 text-gray-400" />
+            </div>
+          )}
+        </div>
+      </div>
+    </CardContent>
+  </Card>
+)
+
+// Placeholder for rows whose page of results is still loading
+const AdCardSkeleton = () => (
+  <Card className="h-[216px] animate-pulse bg-gray-100" />
+)
+
 function App() {
   const [pageIds, setPageIds] = useState('')
-  const [ads, setAds] = useState([])
   const [pages, setPages] = useState([])
   const [jobs, setJobs] = useState([])
   const [stats, setStats] = useState({ total_pages: 0, total_ads: 0, recent_jobs: [] })
   const [loading, setLoading] = useState(false)
   const [searchTerm, setSearchTerm] = useState('')
   const [selectedPage, setSelectedPage] = useState('')
+  const [selectedPlatform, setSelectedPlatform] = useState('')
+  const [startDateFrom, setStartDateFrom] = useState('')
+  const [startDateTo, setStartDateTo] = useState('')
+  const [adsRefreshKey, setAdsRefreshKey] = useState(0)
   const [currentJob, setCurrentJob] = useState(null)
 
+  // Filtering happens in the /ads query; only typing in the search box is debounced
+  const debouncedSearchTerm = useDebouncedValue(searchTerm.trim(), 300)
+  const adsQuery = useAdsQuery(API_BASE_URL, {
+    search: debouncedSearchTerm,
+    pageId: selectedPage,
+    platform: selectedPlatform,
+    startDateFrom,
+    startDateTo,
+  }, adsRefreshKey)
+
+  const pageNames = useMemo(
+    () => Object.fromEntries(pages.map(page => [page.page_id, page.page_name])),
+    [pages]
+  )
+
   // Fetch initial data
   useEffect(() => {
     fetchStats()
     fetchPages()
-    fetchAds()
     fetchJobs()
   }, [])
 
-  // Filter ads based on search and page selection
-  const filteredAds = ads.filter(ad => {
-    const matchesSearch = !searchTerm || 
-      ad.ad_text?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      ad.page_id?.toLowerCase().includes(searchTerm.toLowerCase())
-    const matchesPage = !selectedPage || ad.page_id === selectedPage
-    return matchesSearch && matchesPage
-  })
-
   const fetchStats = async () => {
     try {
       const response = await fetch(`${API_BASE_URL}/stats`)
@@ -62,16 +144,9 @@ function App() {
     }
   }
 
-  const fetchAds = async () => {
-    try {
-      const response = await fetch(`${API_BASE_URL}/ads?per_page=100`)
-      const data = await response.json()
-      if (data.success) {
-        setAds(data.ads)
-      }
-    } catch (error) {
-      console.error('Error fetching ads:', error)
-    }
+  const refreshAds = () => {
+    clearAdsCache()
+    setAdsRefreshKey(key => key + 1)
   }
 
   const fetchJobs = async () => {
@@ -141,7 +216,7 @@ function App() {
             // Refresh data
             fetchStats()
             fetchPages()
-            fetchAds()
+            refreshAds()
             fetchJobs()
             
             if (data.job.status === 'completed') {
@@ -158,66 +233,6 @@ function App() {
     }, 3000) // Poll every 3 seconds
   }
 
-  const formatDate = (dateString) => {
-    if (!dateString) return 'N/A'
-    return new Date(dateString).toLocaleDateString()
-  }
-
-  const AdCard = ({ ad }) => (
-    <Card className="mb-4 hover:shadow-lg transition-shadow">
-      <CardHeader className="pb-3">
-        <div className="flex justify-between items-start">
-          <div>
-            <CardTitle className="text-lg">{pages.find(p => p.page_id === ad.page_id)?.page_name || ad.page_id}</CardTitle>
-            <CardDescription>Library ID: {ad.library_id}</CardDescription>
-          </div>
-          <div className="flex gap-2">
-            {ad.platforms?.map(platform => (
-              <Badge key={platform} variant="secondary">{platform}</Badge>
-            ))}
-          </div>
-        </div>
-      </CardHeader>
-      <CardContent>
-        <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
-          <div className="md:col-span-2">
-            <p className="text-sm text-gray-600 mb-2">{ad.ad_text}</p>
-            <div className="flex items-center gap-4 text-xs text-gray-500">
-              <div className="flex items-center gap-1">
-                <Calendar className="w-3 h-3" />
-                Started: {formatDate(ad.start_date)}
-              </div>
-              {ad.cta && (
-                <Badge variant="outline">{ad.cta}</Badge>
-              )}
-            </div>
-          </div>
-          <div className="flex justify-center items-center">
-            {ad.media_url ? (
-              <div className="relative">
-                <img 
-                  src={ad.media_url} 
-                  alt="Ad creative" 
-                  className="w-24 h-24 object-cover rounded-lg"
-                  onError={(e) => {
-                    e.target.style.display = 'none'
-                  }}
-                />
-                <Badge className="absolute -top-1 -right-1 text-xs">
-                  {ad.media_type}
-                </Badge>
-              </div>
-            ) : (
-              <div className="w-24 h-24 bg-gray-100 rounded-lg flex items-center justify-center">
-                <Eye className="w-6 h-6 text-gray-400" />
-              </div>
-            )}
-          </div>
-        </div>
-      </CardContent>
-    </Card>
-  )
-
   return (
     <div className="min-h-screen bg-gray-50">
       <div className="container mx-auto px-4 py-8">
@@ -346,27 +361,60 @@ function App() {
                       </option>
                     ))}
                   </select>
+                  <select
+                    value={selectedPlatform}
+                    onChange={(e) => setSelectedPlatform(e.target.value)}
+                    className="px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500"
+                  >
+                    <option value="">All Platforms</option>
+                    {PLATFORMS.map(platform => (
+                      <option key={platform} value={platform}>{platform}</option>
+                    ))}
+                  </select>
+                  <div className="flex items-center gap-2">
+                    <Input
+                      type="date"
+                      aria-label="Started on or after"
+                      value={startDateFrom}
+                      onChange={(e) => setStartDateFrom(e.target.value)}
+                    />
+                    <span className="text-sm text-gray-500">to</span>
+                    <Input
+                      type="date"
+                      aria-label="Started on or before"
+                      value={startDateTo}
+                      onChange={(e) => setStartDateTo(e.target.value)}
+                    />
+                  </div>
                 </div>
-                <div className="text-sm text-gray-600">
-                  Showing {filteredAds.length} of {ads.length} ads
+                <div className="text-sm text-gray-600 flex items-center gap-2">
+                  {adsQuery.loading && <Loader2 className="w-4 h-4 animate-spin" />}
+                  Showing {adsQuery.total} of {stats.total_ads} ads
                 </div>
+                {adsQuery.error && (
+                  <div className="text-sm text-red-600">{adsQuery.error}</div>
+                )}
               </CardContent>
             </Card>
 
-            <div className="space-y-4">
-              {filteredAds.length === 0 ? (
-                <Card>
-                  <CardContent className="py-8 text-center">
-                    <Eye className="w-12 h-12 text-gray-400 mx-auto mb-4" />
-                    <p className="text-gray-600">No ads found. Start by scraping some Facebook pages!</p>
-                  </CardContent>
-                </Card>
-              ) : (
-                filteredAds.map(ad => (
-                  <AdCard key={ad.id} ad={ad} />
-                ))
-              )}
-            </div>
+            {!adsQuery.loading && adsQuery.total === 0 ? (
+              <Card>
+                <CardContent className="py-8 text-center">
+                  <Eye className="w-12 h-12 text-gray-400 mx-auto mb-4" />
+                  <p className="text-gray-600">No ads found. Start by scraping some Facebook pages!</p>
+                </CardContent>
+              </Card>
+            ) : (
+              <VirtualGrid
+                itemCount={adsQuery.total}
+                rowHeight={AD_ROW_HEIGHT}
+                onRangeChange={adsQuery.ensureRange}
+                renderItem={(index) => {
+                  const ad = adsQuery.getAd(index)
+                  return ad ? <AdCard ad={ad} pageName={pageNames[ad.page_id]} /> : <AdCardSkeleton />
+                }}
+              />
+            )}
           </TabsContent>
 
           <TabsContent value="pages" className="space-y-6">
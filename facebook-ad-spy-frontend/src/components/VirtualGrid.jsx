@@ -0,0 +1,103 @@
+import { useEffect, useRef, useState } from 'react'
+
+// Browsers cap element heights (~17M px in Firefox); beyond this the scroll
+// range is compressed and rows are positioned relative to the viewport
+const MAX_SCROLL_HEIGHT = 8_000_000
+
+// Window-scrolled grid that only mounts the rows around the viewport.
+// Rows have a fixed height; the column count follows the container width.
+export function VirtualGrid({ itemCount, rowHeight, minColumnWidth = 480, overscan = 3, renderItem, onRangeChange }) {
+  const containerRef = useRef(null)
+  const [layout, setLayout] = useState({ columns: 1, firstRow: 0, lastRow: 0, offset: 0, virtualOffset: 0 })
+
+  const columns = layout.columns
+  const rowCount = Math.ceil(itemCount / columns)
+  const height = Math.min(rowCount * rowHeight, MAX_SCROLL_HEIGHT)
+
+  useEffect(() => {
+    let frame = null
+
+    const update = () => {
+      frame = null
+      const container = containerRef.current
+      if (!container) return
+
+      const rect = container.getBoundingClientRect()
+      const nextColumns = Math.max(1, Math.floor(rect.width / minColumnWidth))
+      const nextRowCount = Math.ceil(itemCount / nextColumns)
+      const virtualHeight = nextRowCount * rowHeight
+      const viewportHeight = window.innerHeight
+
+      // Pixels of the list scrolled past the top of the viewport, mapped so
+      // that the end of the real scroll range reaches the last row
+      const scrolled = Math.max(0, -rect.top)
+      let virtualScrolled = scrolled
+      if (virtualHeight > MAX_SCROLL_HEIGHT) {
+        const scrollRange = Math.max(1, MAX_SCROLL_HEIGHT - viewportHeight)
+        virtualScrolled = Math.min(scrolled, scrollRange) * (virtualHeight - viewportHeight) / scrollRange
+      }
+      const visibleRows = Math.ceil(viewportHeight / rowHeight)
+      const firstRow = Math.max(0, Math.floor(virtualScrolled / rowHeight) - overscan)
+      const lastRow = Math.min(nextRowCount, Math.floor(virtualScrolled / rowHeight) + visibleRows + overscan)
+
+      // Uncompressed rows sit at row * rowHeight, so the scroll position only
+      // needs to be in state (and re-render every frame) when compressed
+      const compressed = scrolled !== virtualScrolled
+      const offset = compressed ? scrolled : 0
+      const virtualOffset = compressed ? virtualScrolled : 0
+
+      setLayout((prev) => (
+        prev.columns === nextColumns && prev.firstRow === firstRow && prev.lastRow === lastRow
+          && prev.offset === offset && prev.virtualOffset === virtualOffset
+          ? prev
+          : { columns: nextColumns, firstRow, lastRow, offset, virtualOffset }
+      ))
+    }
+    const schedule = () => {
+      if (frame === null) frame = requestAnimationFrame(update)
+    }
+
+    update()
+    window.addEventListener('scroll', schedule, { passive: true })
+    window.addEventListener('resize', schedule)
+    return () => {
+      window.removeEventListener('scroll', schedule)
+      window.removeEventListener('resize', schedule)
+      if (frame !== null) cancelAnimationFrame(frame)
+    }
+  }, [itemCount, rowHeight, minColumnWidth, overscan])
+
+  const firstRow = layout.firstRow
+  const lastRow = Math.min(layout.lastRow, rowCount)
+
+  useEffect(() => {
+    if (lastRow > firstRow) {
+      onRangeChange?.(firstRow * columns, Math.min(itemCount, lastRow * columns) - 1)
+    }
+  }, [firstRow, lastRow, columns, itemCount, onRangeChange])
+
+  const rows = []
+  for (let row = firstRow; row < lastRow; row++) {
+    // Without compression offset === virtualOffset and this is row * rowHeight
+    const top = layout.offset + row * rowHeight - layout.virtualOffset
+    const cells = []
+    for (let index = row * columns; index < Math.min(itemCount, (row + 1) * columns); index++) {
+      cells.push(<div key={index} className="min-w-0">{renderItem(index)}</div>)
+    }
+    rows.push(
+      <div
+        key={row}
+        className="absolute inset-x-0 grid gap-4"
+        style={{ top, height: rowHeight, gridTemplateColumns: `repeat(${columns}, minmax(0, 1fr))` }}
+      >
+        {cells}
+      </div>
+    )
+  }
+
+  return (
+    <div ref={containerRef} className="relative" style={{ height }}>
+      {rows}
+    </div>
+  )
+}
@@ -0,0 +1,126 @@
+import * as React from "react"
+
+const PAGE_SIZE = 100
+const CACHE_TTL_MS = 60_000
+const CACHE_MAX_ENTRIES = 200
+
+// /ads responses keyed by query string, shared by every useAdsQuery caller
+const responseCache = new Map()
+
+export function clearAdsCache() {
+  responseCache.clear()
+}
+
+function buildQuery(filters) {
+  const params = new URLSearchParams({ per_page: PAGE_SIZE })
+  if (filters.search) params.set("search", filters.search)
+  if (filters.pageId) params.set("page_id", filters.pageId)
+  if (filters.platform) params.set("platform", filters.platform)
+  if (filters.startDateFrom) params.set("start_date_from", filters.startDateFrom)
+  if (filters.startDateTo) params.set("start_date_to", filters.startDateTo)
+  return params.toString()
+}
+
+async function fetchAdsPage(apiBaseUrl, query, page, signal) {
+  const key = `${query}&page=${page}`
+  const cached = responseCache.get(key)
+  if (cached && Date.now() - cached.fetchedAt < CACHE_TTL_MS) {
+    return cached.data
+  }
+
+  const response = await fetch(`${apiBaseUrl}/ads?${key}`, { signal })
+  const data = await response.json()
+  if (!data.success) {
+    throw new Error(data.error)
+  }
+
+  // Map keeps insertion order, so the first key is the oldest entry
+  responseCache.delete(key)
+  responseCache.set(key, { data, fetchedAt: Date.now() })
+  if (responseCache.size > CACHE_MAX_ENTRIES) {
+    responseCache.delete(responseCache.keys().next().value)
+  }
+  return data
+}
+
+// Server-side filtered ads, fetched page by page as rows come into view.
+// Page 1 pins a snapshot that every later page is read at. Bump refreshKey
+// (after clearAdsCache) to start over on a new snapshot of the current query.
+export function useAdsQuery(apiBaseUrl, filters, refreshKey = 0) {
+  const query = buildQuery(filters)
+  const [result, setResult] = React.useState({ key: null, query: null, total: 0, pages: {} })
+  const [error, setError] = React.useState(null)
+  // Requests of the current query/refresh; replaced (and aborted) when either changes
+  const session = React.useRef({ key: null, controller: null, requestedPages: new Set(), firstPage: null })
+
+  const loadPage = React.useCallback((page) => {
+    const key = `${query}#${refreshKey}`
+    if (session.current.key !== key) {
+      session.current.controller?.abort()
+      const controller = new AbortController()
+      const firstPage = fetchAdsPage(apiBaseUrl, query, 1, controller.signal)
+      session.current = { key, controller, requestedPages: new Set(), firstPage }
+    }
+    const current = session.current
+    const { controller, requestedPages, firstPage } = current
+    if (requestedPages.has(page)) return
+    requestedPages.add(page)
+
+    const request = page === 1 ? firstPage : firstPage.then((first) => {
+      const { snapshot_id: snapshotId, pages } = first.pagination
+      if (page > pages) return null
+      return fetchAdsPage(apiBaseUrl, `${query}&max_id=${snapshotId}`, page, controller.signal)
+    })
+
+    request
+      .then((data) => {
+        if (controller.signal.aborted || !data) return
+        // Pages of an earlier snapshot are dropped, not merged: their offsets
+        // no longer line up with the new ones
+        setResult((prev) => ({
+          key,
+          query,
+          total: data.pagination.total,
+          pages: { ...(prev.key === key ? prev.pages : {}), [page]: data.ads },
+        }))
+        setError(null)
+      })
+      .catch((err) => {
+        if (err.name === "AbortError") return
+        requestedPages.delete(page)
+        // Without page 1 there is no snapshot; the next request starts a new session
+        if (page === 1 && session.current === current) {
+          session.current = { ...current, key: null }
+        }
+        setError(err.message)
+      })
+  }, [apiBaseUrl, query, refreshKey])
+
+  React.useEffect(() => {
+    loadPage(1)
+  }, [loadPage])
+
+  React.useEffect(() => () => session.current.controller?.abort(), [])
+
+  // A new loadPage (new query or refresh) also changes ensureRange, so the
+  // grid asks again for the rows it is showing
+  const ensureRange = React.useCallback((startIndex, endIndex) => {
+    const firstPage = Math.floor(startIndex / PAGE_SIZE) + 1
+    const lastPage = Math.floor(endIndex / PAGE_SIZE) + 1
+    for (let page = firstPage; page <= lastPage; page++) {
+      loadPage(page)
+    }
+  }, [loadPage])
+
+  // Keep showing the previous results while a refresh of the same query loads
+  const current = result.query === query ? result : { total: 0, pages: {} }
+  const getAd = (index) => current.pages[Math.floor(index / PAGE_SIZE) + 1]?.[index % PAGE_SIZE]
+
+  return {
+    total: current.total,
+    getAd,
+    ensureRange,
+    loading: result.query !== query,
+    error,
+  }
+}
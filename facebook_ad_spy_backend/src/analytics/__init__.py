@@ -0,0 +1 @@
+# Pre-aggregated ad analytics
@@ -0,0 +1,158 @@
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import case
+from sqlalchemy.exc import IntegrityError
+from src.models.user import db
+from src.models.ad import Ad
+from src.models.scraping_job import ScrapingJob
+from src.models.ad_rollup import AdDailyRollup, PageLongevityRollup
+import logging
+
+logger = logging.getLogger(__name__)
+
+def rollup_key(ad):
+    """Key of the daily rollup row an ad is counted in.
+
+    Ads are bucketed by the day they started running, falling back to the
+    day we first saw them when the Ads Library did not show a start date.
+    """
+    day = ad.start_date or (ad.scraped_at or datetime.utcnow()).date()
+    platforms = ','.join(sorted(ad.get_platforms_list()))
+    return (ad.page_id, day, ad.cta or '', platforms)
+
+def longevity_days(ad):
+    """Days between an ad's start_date and the last time we saw it"""
+    last_seen = ad.last_seen_at or ad.scraped_at
+    if not ad.start_date or not last_seen:
+        return None
+    return max((last_seen.date() - ad.start_date).days, 0)
+
+class RollupWriter:
+    """Accumulates rollup deltas for a batch of ads and applies them in one pass.
+
+    The scrape writer calls add_new_ad / mark_seen while it walks a page's
+    ads, then flush() before committing, so each rollup row is touched once
+    per batch no matter how many ads fall into it.
+    """
+
+    def __init__(self):
+        self.daily = defaultdict(int)
+        self.longevity = defaultdict(lambda: [0, 0, 0])  # page_id -> [ads, total_days, max_days]
+
+    def add_new_ad(self, ad):
+        """Count an ad that was just inserted"""
+        self.daily[rollup_key(ad)] += 1
+        days = longevity_days(ad)
+        if days is not None:
+            self._add_longevity(ad.page_id, 1, days, days)
+
+    def mark_seen(self, ad, seen_at):
+        """Move an existing ad's last_seen_at forward and extend its lifetime"""
+        previous_days = longevity_days(ad)
+        ad.last_seen_at = seen_at
+        days = longevity_days(ad)
+        if previous_days is not None and days > previous_days:
+            self._add_longevity(ad.page_id, 0, days - previous_days, days)
+
+    def _add_longevity(self, page_id, ads, days, max_days):
+        totals = self.longevity[page_id]
+        totals[0] += ads
+        totals[1] += days
+        totals[2] = max(totals[2], max_days)
+
+    def flush(self):
+        """Apply accumulated deltas to the rollup tables (caller commits)
+
+        Counters are incremented in SQL rather than read and written back,
+        so concurrent scraping jobs never overwrite each other's counts.
+        """
+        for (page_id, day, cta, platforms), count in self.daily.items():
+            _increment_or_insert(
+                AdDailyRollup,
+                {'page_id': page_id, 'day': day, 'cta': cta, 'platforms': platforms},
+                {AdDailyRollup.ad_count: AdDailyRollup.ad_count + count},
+                {'ad_count': count}
+            )
+
+        for page_id, (ads, days, max_days) in self.longevity.items():
+            _increment_or_insert(
+                PageLongevityRollup,
+                {'page_id': page_id},
+                {
+                    PageLongevityRollup.ad_count: PageLongevityRollup.ad_count + ads,
+                    PageLongevityRollup.total_days: PageLongevityRollup.total_days + days,
+                    PageLongevityRollup.max_days: case(
+                        (PageLongevityRollup.max_days < max_days, max_days),
+                        else_=PageLongevityRollup.max_days
+                    ),
+                },
+                {'ad_count': ads, 'total_days': days, 'max_days': max_days}
+            )
+
+        self.daily.clear()
+        self.longevity.clear()
+
+def _increment_or_insert(model, key, increments, initial):
+    """Apply increments to the row matching key, inserting it if it does not exist yet"""
+    updated = model.query.filter_by(**key).update(increments, synchronize_session=False)
+    if updated:
+        return
+    try:
+        # Savepoint, so losing an insert race only undoes this row
+        with db.session.begin_nested():
+            db.session.add(model(**key, **initial))
+    except IntegrityError:
+        # Another writer created the row in the meantime
+        model.query.filter_by(**key).update(increments, synchronize_session=False)
+
+def rebuild_rollups(batch_size=1000, force=False):
+    """
+    Recompute every rollup table from the ad table
+
+    Scraping jobs update the rollups while they save ads, so a rebuild
+    that overlaps one would count its ads twice or lose them; it refuses
+    to run while any job is pending or running.
+
+    Args:
+        batch_size (int): Number of ads loaded per round trip
+        force (bool): Rebuild anyway, e.g. when jobs were left pending or
+            running by a server restart
+
+    Returns:
+        dict: Number of ads scanned and rollup rows written
+
+    Raises:
+        RuntimeError: If a scraping job is pending or running
+    """
+    active_jobs = ScrapingJob.query.filter(ScrapingJob.status.in_(['pending', 'running'])).count()
+    if active_jobs and not force:
+        raise RuntimeError(f"{active_jobs} scraping job(s) pending or running; rebuild rollups once they finish (or force)")
+
+    AdDailyRollup.query.delete()
+    PageLongevityRollup.query.delete()
+
+    writer = RollupWriter()
+    ads_scanned = 0
+    for ad in Ad.query.order_by(Ad.id).yield_per(batch_size):
+        writer.add_new_ad(ad)
+        ads_scanned += 1
+
+    # Tables were just emptied, so insert rows directly instead of flush()'s get-or-create
+    db.session.add_all(
+        AdDailyRollup(page_id=page_id, day=day, cta=cta, platforms=platforms, ad_count=count)
+        for (page_id, day, cta, platforms), count in writer.daily.items()
+    )
+    db.session.add_all(
+        PageLongevityRollup(page_id=page_id, ad_count=ads, total_days=days, max_days=max_days)
+        for page_id, (ads, days, max_days) in writer.longevity.items()
+    )
+    daily_rows = len(writer.daily)
+    longevity_rows = len(writer.longevity)
+    db.session.commit()
+
+    logger.info(f"Rebuilt rollups from {ads_scanned} ads")
+    return {
+        'ads_scanned': ads_scanned,
+        'daily_rows': daily_rows,
+        'longevity_rows': longevity_rows
+    }
@@ -3,50 +3,112 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+import click
 from flask import Flask, send_from_directory
+from flask.cli import with_appcontext
 from flask_cors import CORS
+from sqlalchemy import inspect, text
 from src.models.user import db
 from src.models.page import Page
 from src.models.ad import Ad
 from src.models.scraping_job import ScrapingJob
+from src.models.ad_rollup import AdDailyRollup, PageLongevityRollup
 from src.routes.user import user_bp
 from src.routes.ads import ads_bp
+from src.routes.analytics import analytics_bp
+from src.analytics.rollups import rebuild_rollups
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+# Columns added after the initial schema; create_all() does not add columns to existing tables
+ADDED_COLUMNS = [
+    ('ad', 'last_seen_at'),
+    ('scraping_job', 'skipped_page_ids'),
+    ('scraping_job', 'coalesced_page_ids'),
+    ('scraping_job', 'partition_coverage'),
+    ('page', 'last_scrape_max_ads'),
+    ('page', 'last_scrape_partitions'),
+]
 
-# Enable CORS for all routes
-CORS(app)
+def init_database():
+    """Create missing tables, columns and indexes (needs an app context)"""
+    inspector = inspect(db.engine)
+    rollup_tables = [AdDailyRollup.__tablename__, PageLongevityRollup.__tablename__]
+    new_rollup_tables = [table for table in rollup_tables if not inspector.has_table(table)]
+    db.create_all()
+    for table, column in ADDED_COLUMNS:
+        if column not in {existing['name'] for existing in inspector.get_columns(table)}:
+            # Column type as declared on the model, in the engine's dialect
+            column_type = db.metadata.tables[table].c[column].type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as connection:
+                connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}'))
+    # Same for indexes declared on existing tables
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    # Rollups are only maintained for ads saved after they exist, so backfill
+    # them when upgrading a database that already has ads. No job of this
+    # process can be running yet; jobs left pending by a restart never resume.
+    if new_rollup_tables:
+        rebuild_rollups(force=True)
 
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(ads_bp, url_prefix='/api')
+@click.command('rebuild-rollups')
+@click.option('--batch-size', default=1000, show_default=True, help='Ads loaded per round trip')
+@click.option('--force', is_flag=True, help='Rebuild even if scraping jobs are pending or running')
+@with_appcontext
+def rebuild_rollups_command(batch_size, force):
+    """Recompute analytics rollups from the ad table (for backfills)"""
+    try:
+        result = rebuild_rollups(batch_size=batch_size, force=force)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Rebuilt rollups from {result['ads_scanned']} ads "
+               f"({result['daily_rows']} daily rows, {result['longevity_rows']} longevity rows)")
 
-# uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
+def create_app():
+    """
+    Build the Flask app and bring the database schema up to date
+    
+    Kept out of module scope: parser worker processes are spawned and
+    re-import this file as __mp_main__, and must not touch the database.
+    """
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+
+    # Enable CORS for all routes
+    CORS(app)
+
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(ads_bp, url_prefix='/api')
+    app.register_blueprint(analytics_bp, url_prefix='/api')
+
+    # uncomment if you need to use database
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        init_database()
 
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
+    app.cli.add_command(rebuild_rollups_command)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        static_folder_path = app.static_folder
+        if static_folder_path is None:
+                return "Static folder not configured", 404
+
+        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
+            return send_from_directory(static_folder_path, path)
         else:
-            return "index.html not found", 404
+            index_path = os.path.join(static_folder_path, 'index.html')
+            if os.path.exists(index_path):
+                return send_from_directory(static_folder_path, 'index.html')
+            else:
+                return "index.html not found", 404
 
+    return app
 
-if __name__ == '__main__':
-    import os
-port = int(os.environ.get('PORT', 5001))
-app.run(host='0.0.0.0', port=port, debug=False)
 
+if __name__ == '__main__':
+    app = create_app()
+    port = int(os.environ.get('PORT', 5001))
+    app.run(host='0.0.0.0', port=port, debug=False)
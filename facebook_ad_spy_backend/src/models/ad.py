@@ -5,15 +5,16 @@ from src.models.user import db
 
 class Ad(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    page_id = db.Column(db.String(50), db.ForeignKey('page.page_id'), nullable=False)
+    page_id = db.Column(db.String(50), db.ForeignKey('page.page_id'), nullable=False, index=True)
     library_id = db.Column(db.String(50), unique=True, nullable=False)
     ad_text = db.Column(db.Text)
     media_url = db.Column(db.String(500))
     media_type = db.Column(db.String(20))  # image, video
-    start_date = db.Column(db.Date)
+    start_date = db.Column(db.Date, index=True)
     platforms = db.Column(db.Text)  # JSON string of platforms
     cta = db.Column(db.String(100))
-    scraped_at = db.Column(db.DateTime, default=datetime.utcnow)
+    scraped_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow)  # most recent scrape that returned this ad
 
     def __repr__(self):
         return f'<Ad {self.library_id}: {self.ad_text[:50]}...>'
@@ -42,6 +43,7 @@ class Ad(db.Model):
             'start_date': self.start_date.isoformat() if self.start_date else None,
             'platforms': self.get_platforms_list(),
             'cta': self.cta,
-            'scraped_at': self.scraped_at.isoformat() if self.scraped_at else None
+            'scraped_at': self.scraped_at.isoformat() if self.scraped_at else None,
+            'last_seen_at': self.last_seen_at.isoformat() if self.last_seen_at else None
         }
 
@@ -0,0 +1,55 @@
+from datetime import datetime
+from src.models.user import db
+
+class AdDailyRollup(db.Model):
+    """New ads per page per day, split by CTA and platform combination.
+
+    Empty strings stand in for a missing CTA / platform list so the unique
+    key works on every backend (NULLs never collide in unique constraints).
+    """
+    __tablename__ = 'ad_daily_rollup'
+    __table_args__ = (
+        db.UniqueConstraint('page_id', 'day', 'cta', 'platforms', name='uq_ad_daily_rollup_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    page_id = db.Column(db.String(50), nullable=False, index=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    cta = db.Column(db.String(100), nullable=False, default='')
+    platforms = db.Column(db.String(200), nullable=False, default='')  # sorted, comma-separated
+    ad_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<AdDailyRollup {self.page_id} {self.day}: {self.ad_count}>'
+
+    def to_dict(self):
+        return {
+            'page_id': self.page_id,
+            'day': self.day.isoformat() if self.day else None,
+            'cta': self.cta or None,
+            'platforms': self.platforms.split(',') if self.platforms else [],
+            'ad_count': self.ad_count
+        }
+
+class PageLongevityRollup(db.Model):
+    """Running totals of ad lifetime (start_date to last seen) per page"""
+    __tablename__ = 'page_longevity_rollup'
+
+    id = db.Column(db.Integer, primary_key=True)
+    page_id = db.Column(db.String(50), unique=True, nullable=False)
+    ad_count = db.Column(db.Integer, nullable=False, default=0)  # ads with a known start_date
+    total_days = db.Column(db.Integer, nullable=False, default=0)
+    max_days = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<PageLongevityRollup {self.page_id}: {self.ad_count} ads>'
+
+    def to_dict(self):
+        return {
+            'page_id': self.page_id,
+            'ad_count': self.ad_count,
+            'avg_days': round(self.total_days / self.ad_count, 2) if self.ad_count else None,
+            'max_days': self.max_days if self.ad_count else None
+        }
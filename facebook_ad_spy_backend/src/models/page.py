@@ -8,6 +8,8 @@ class Page(db.Model):
     page_name = db.Column(db.String(200))
     last_scraped = db.Column(db.DateTime)
     status = db.Column(db.String(20), default='pending')  # pending, scraping, completed, error
+    last_scrape_max_ads = db.Column(db.Integer)  # ad cap of the last completed scrape; 0 = uncapped
+    last_scrape_partitions = db.Column(db.String(40))  # partition key of that scrape; None = unpartitioned
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationship with ads
@@ -23,6 +25,8 @@ class Page(db.Model):
             'page_name': self.page_name,
             'last_scraped': self.last_scraped.isoformat() if self.last_scraped else None,
             'status': self.status,
+            'last_scrape_max_ads': self.last_scrape_max_ads,
+            'last_scrape_partitions': self.last_scrape_partitions,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'ad_count': len(self.ads)
         }
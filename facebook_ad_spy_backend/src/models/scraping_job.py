@@ -10,6 +10,9 @@ class ScrapingJob(db.Model):
     started_at = db.Column(db.DateTime)
     completed_at = db.Column(db.DateTime)
     error_message = db.Column(db.Text)
+    skipped_page_ids = db.Column(db.Text)  # JSON string of page IDs served from the DB (still fresh)
+    coalesced_page_ids = db.Column(db.Text)  # JSON string of page IDs shared with another crawl
+    partition_coverage = db.Column(db.Text)  # JSON string: page_id -> partition label -> coverage stats
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def __repr__(self):
@@ -28,10 +31,51 @@ class ScrapingJob(db.Model):
         """Convert page_ids list to JSON string"""
         self.page_ids = json.dumps(page_ids_list) if page_ids_list else None
 
+    def get_skipped_page_ids_list(self):
+        """Convert skipped_page_ids JSON string to list"""
+        return self._load_list(self.skipped_page_ids)
+
+    def set_skipped_page_ids_list(self, page_ids_list):
+        """Convert skipped page IDs list to JSON string"""
+        self.skipped_page_ids = json.dumps(page_ids_list) if page_ids_list else None
+
+    def get_coalesced_page_ids_list(self):
+        """Convert coalesced_page_ids JSON string to list"""
+        return self._load_list(self.coalesced_page_ids)
+
+    def set_coalesced_page_ids_list(self, page_ids_list):
+        """Convert coalesced page IDs list to JSON string"""
+        self.coalesced_page_ids = json.dumps(page_ids_list) if page_ids_list else None
+
+    def get_partition_coverage_dict(self):
+        """Convert partition_coverage JSON string to dict"""
+        if self.partition_coverage:
+            try:
+                return json.loads(self.partition_coverage)
+            except json.JSONDecodeError:
+                return {}
+        return {}
+
+    def set_partition_coverage_dict(self, coverage):
+        """Convert partition coverage dict to JSON string"""
+        self.partition_coverage = json.dumps(coverage) if coverage else None
+
+    @staticmethod
+    def _load_list(value):
+        if value:
+            try:
+                return json.loads(value)
+            except json.JSONDecodeError:
+                return []
+        return []
+
     def to_dict(self):
         return {
             'id': self.id,
             'page_ids': self.get_page_ids_list(),
+            'skipped_page_ids': self.get_skipped_page_ids_list(),
+            'coalesced_page_ids': self.get_coalesced_page_ids_list(),
+            'partition_coverage': self.get_partition_coverage_dict(),
             'status': self.status,
             'started_at': self.started_at.isoformat() if self.started_at else None,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
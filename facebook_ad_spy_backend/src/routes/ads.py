@@ -1,12 +1,19 @@
-from flask import Blueprint, request, jsonify
-from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
+from collections import Counter
+from datetime import datetime, date, timedelta
+from sqlalchemy import func, or_
 import asyncio
+import os
 import threading
+from contextlib import aclosing
 from src.models.user import db
 from src.models.page import Page
 from src.models.ad import Ad
 from src.models.scraping_job import ScrapingJob
-from src.scraper.facebook_scraper import scrape_facebook_ads
+from src.analytics.rollups import RollupWriter
+from src.scraper.facebook_scraper import FacebookAdsScraper
+from src.scraper.single_flight import CrawlSpec, page_flights
+from src.scraper.partitions import build_partitions, partition_key
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -14,6 +21,39 @@ logger = logging.getLogger(__name__)
 
 ads_bp = Blueprint('ads', __name__)
 
+# Upper bound for the per_page argument of GET /ads
+MAX_ADS_PER_PAGE = 200
+
+# Pages successfully scraped within this many seconds are served from the DB
+# unless the request sets "force"; 0 disables the check
+SCRAPE_FRESHNESS_TTL = int(os.environ.get('SCRAPE_FRESHNESS_TTL', 3600))
+
+def get_fresh_page_ids(page_ids, spec=CrawlSpec()):
+    """
+    Page IDs that completed a scrape within SCRAPE_FRESHNESS_TTL
+
+    Only scrapes that collected at least what spec asks for count, so a
+    capped scrape does not make a page fresh for an uncapped request, nor
+    one partitioned differently for a partitioned request.
+    Pages scraped before the cap was recorded are never fresh.
+    """
+    if SCRAPE_FRESHNESS_TTL <= 0 or not page_ids:
+        return set()
+    cutoff = datetime.utcnow() - timedelta(seconds=SCRAPE_FRESHNESS_TTL)
+    pages = Page.query.filter(
+        Page.page_id.in_(page_ids),
+        Page.status == 'completed',
+        Page.last_scraped >= cutoff,
+        Page.last_scrape_max_ads.isnot(None)
+    ).all()
+    return {
+        page.page_id for page in pages
+        if CrawlSpec(
+            max_ads=page.last_scrape_max_ads or None,
+            partition_key=page.last_scrape_partitions
+        ).covers(spec)
+    }
+
 @ads_bp.route('/pages', methods=['GET'])
 def get_pages():
     """Get all scraped pages"""
@@ -31,11 +71,14 @@ def get_pages():
 def get_ads():
     """Get ads with optional filtering"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 50, type=int)
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = max(1, min(request.args.get('per_page', 50, type=int), MAX_ADS_PER_PAGE))
         page_id = request.args.get('page_id')
         search_term = request.args.get('search')
         platform = request.args.get('platform')
+        start_date_from = request.args.get('start_date_from')
+        start_date_to = request.args.get('start_date_to')
+        max_id = request.args.get('max_id', type=int)
         
         query = Ad.query
         
@@ -44,13 +87,29 @@ def get_ads():
             query = query.filter(Ad.page_id == page_id)
         
         if search_term:
-            query = query.filter(Ad.ad_text.contains(search_term))
+            query = query.filter(or_(Ad.ad_text.contains(search_term), Ad.page_id.contains(search_term)))
         
         if platform:
             query = query.filter(Ad.platforms.contains(platform))
         
-        # Order by scraped_at descending
-        query = query.order_by(Ad.scraped_at.desc())
+        try:
+            if start_date_from:
+                query = query.filter(Ad.start_date >= date.fromisoformat(start_date_from))
+            if start_date_to:
+                query = query.filter(Ad.start_date <= date.fromisoformat(start_date_to))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Dates must be in YYYY-MM-DD format'}), 400
+        
+        # Pin the results to the ads that existed when the first page was read
+        # (clients pass snapshot_id back as max_id), so ads inserted by running
+        # jobs do not shift the offsets of later pages
+        snapshot_id = max_id if max_id is not None else db.session.query(func.max(Ad.id)).scalar()
+        if snapshot_id is not None:
+            query = query.filter(Ad.id <= snapshot_id)
+        
+        # Order by scraped_at descending; id breaks ties so pages of one
+        # snapshot never overlap
+        query = query.order_by(Ad.scraped_at.desc(), Ad.id.desc())
         
         # Paginate
         ads_pagination = query.paginate(
@@ -66,7 +125,8 @@ def get_ads():
                 'total': ads_pagination.total,
                 'pages': ads_pagination.pages,
                 'has_next': ads_pagination.has_next,
-                'has_prev': ads_pagination.has_prev
+                'has_prev': ads_pagination.has_prev,
+                'snapshot_id': snapshot_id
             }
         })
     except Exception as e:
@@ -79,22 +139,74 @@ def start_scraping():
     try:
         data = request.get_json()
         page_ids = data.get('page_ids', [])
-        max_ads_per_page = data.get('max_ads_per_page')
+        max_ads_per_page = data.get('max_ads_per_page') or None
+        force = bool(data.get('force', False))
+        partition = data.get('partition')
         
         if not page_ids:
             return jsonify({'success': False, 'error': 'No page IDs provided'}), 400
         
+        if max_ads_per_page is not None and (
+                not isinstance(max_ads_per_page, int) or isinstance(max_ads_per_page, bool)
+                or max_ads_per_page < 1):
+            return jsonify({'success': False, 'error': 'max_ads_per_page must be a positive integer'}), 400
+        
+        # Optional partitioned crawl, e.g. {"by": ["active_status", "media_type"]}
+        partitions = None
+        if partition:
+            try:
+                partitions = build_partitions(
+                    partition.get('by'),
+                    countries=partition.get('countries'),
+                    start_date=partition.get('start_date'),
+                    window_days=partition.get('window_days', 30)
+                )
+            except (ValueError, TypeError, AttributeError) as e:
+                return jsonify({'success': False, 'error': f'Invalid partition: {str(e)}'}), 400
+        
+        # Repeated IDs in one request share a single crawl
+        unique_page_ids = list(dict.fromkeys(page_ids))
+        duplicate_page_ids = [page_id for page_id, count in Counter(page_ids).items() if count > 1]
+        
+        spec = CrawlSpec(max_ads=max_ads_per_page, partition_key=partition_key(partitions))
+        fresh_page_ids = set() if force else get_fresh_page_ids(unique_page_ids, spec)
+        skipped_page_ids = [page_id for page_id in unique_page_ids if page_id in fresh_page_ids]
+        pages_to_scrape = [page_id for page_id in unique_page_ids if page_id not in fresh_page_ids]
+        
         # Create scraping job
         job = ScrapingJob()
         job.set_page_ids_list(page_ids)
+        job.set_skipped_page_ids_list(skipped_page_ids)
+        job.set_coalesced_page_ids_list(duplicate_page_ids)
         job.status = 'pending'
+        if not pages_to_scrape:
+            job.status = 'completed'
+            job.started_at = job.completed_at = datetime.utcnow()
         db.session.add(job)
         db.session.commit()
         
+        if not pages_to_scrape:
+            return jsonify({
+                'success': True,
+                'job_id': job.id,
+                'message': f'All {len(unique_page_ids)} pages were scraped recently, nothing to do',
+                'skipped_page_ids': skipped_page_ids,
+                'coalesced_page_ids': duplicate_page_ids
+            })
+        
+        # Pages another job is crawling right now are shared with it. Checked
+        # before the job starts, so its own claims are not counted; the job
+        # record has the final lists once the job completes
+        coalesced_page_ids = duplicate_page_ids + [
+            page_id for page_id in page_flights.in_flight(pages_to_scrape, spec)
+            if page_id not in duplicate_page_ids
+        ]
+        
         # Start scraping in background thread
         thread = threading.Thread(
             target=run_scraping_job,
-            args=(job.id, page_ids, max_ads_per_page)
+            args=(current_app._get_current_object(), job.id, pages_to_scrape,
+                  max_ads_per_page, force, partitions)
         )
         thread.daemon = True
         thread.start()
@@ -102,7 +214,10 @@ def start_scraping():
         return jsonify({
             'success': True,
             'job_id': job.id,
-            'message': f'Scraping started for {len(page_ids)} pages'
+            'message': f'Scraping started for {len(pages_to_scrape)} pages'
+                       + (f' in {len(partitions)} partitions each' if partitions else ''),
+            'skipped_page_ids': skipped_page_ids,
+            'coalesced_page_ids': coalesced_page_ids
         })
         
     except Exception as e:
@@ -135,10 +250,176 @@ def get_jobs():
         logger.error(f"Error getting jobs: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
-def run_scraping_job(job_id, page_ids, max_ads_per_page=None):
-    """Run scraping job in background"""
-    from src.main import app
-    
+# Ads are buffered in memory and committed in batches of this size while a
+# page is still scrolling
+SAVE_BATCH_SIZE = 100
+
+def save_ads(page_id, records, seen_at, rollups):
+    """Insert a batch of scraped AdRecords and refresh last_seen_at of known ones.
+
+    Runs without awaiting and commits before returning, so the SQLite write
+    lock is never held while the scraper waits for the page to scroll.
+
+    Returns:
+        int: Number of new ads inserted
+    """
+    records = {record.library_id: record for record in records}
+    existing_ads = Ad.query.filter(Ad.library_id.in_(list(records))).all()
+    for existing_ad in existing_ads:
+        rollups.mark_seen(existing_ad, seen_at)
+        del records[existing_ad.library_id]
+
+    for record in records.values():
+        ad = Ad(
+            page_id=page_id,
+            library_id=record.library_id,
+            ad_text=record.ad_text,
+            media_url=record.media_url,
+            media_type=record.media_type,
+            start_date=record.start_date,
+            cta=record.cta,
+            scraped_at=seen_at,
+            last_seen_at=seen_at
+        )
+        ad.set_platforms_list(list(record.platforms))
+        db.session.add(ad)
+        rollups.add_new_ad(ad)
+
+    # Rollups are written in the same transaction as the ads they count
+    rollups.flush()
+    db.session.commit()
+    return len(records)
+
+async def scrape_and_save_page(scraper, page_id, max_ads_per_page=None, partitions=None):
+    """
+    Stream one page's ads from the scraper into the database
+
+    Ads are saved in batches as they are discovered, so memory use does not
+    grow with the number of ads on a page. With partitions, the page is
+    crawled as several parallel Ads Library queries.
+
+    Returns:
+        dict: page_id, page_name, error and ads_saved, plus a per-partition
+            coverage report under 'partitions' for partitioned crawls
+    """
+    # Create or update page record before its ads reference it
+    page = Page.query.filter_by(page_id=page_id).first()
+    if not page:
+        page = Page(page_id=page_id)
+        db.session.add(page)
+    page.status = 'scraping'
+    db.session.commit()
+
+    page_info = {'page_id': page_id, 'ads_saved': 0}
+    rollups = RollupWriter()
+    seen_at = datetime.utcnow()
+    batch = []
+    try:
+        if partitions:
+            ads = scraper.iter_partitioned_page_ads(page_id, partitions, max_ads_per_page, page_info)
+        else:
+            ads = scraper.iter_page_ads(page_id, max_ads_per_page, page_info)
+        async with aclosing(ads):
+            async for record in ads:
+                batch.append(record)
+                if len(batch) >= SAVE_BATCH_SIZE:
+                    page_info['ads_saved'] += save_ads(page_id, batch, seen_at, rollups)
+                    batch = []
+        if batch:
+            page_info['ads_saved'] += save_ads(page_id, batch, seen_at, rollups)
+    except Exception as e:
+        logger.error(f"Error scraping page {page_id}: {str(e)}")
+        page_info['error'] = str(e)
+        # A failed flush/commit leaves the session unusable until rolled back;
+        # this drops the unsaved batch and its rollup deltas together
+        db.session.rollback()
+        rollups = RollupWriter()
+        page = Page.query.filter_by(page_id=page_id).first()
+
+    page.page_name = page_info.get('page_name') or page.page_name
+    page.last_scraped = datetime.utcnow()
+    page.status = 'completed' if not page_info.get('error') else 'error'
+    # A partitioned crawl only reports an error when every partition failed;
+    # with some missing it is still no stand-in for a later request. Clearing
+    # the crawl record keeps the page from counting as fresh.
+    partition_failed = any(stats['error'] for stats in page_info.get('partitions', {}).values())
+    if not page_info.get('error') and not partition_failed:
+        page.last_scrape_max_ads = max_ads_per_page or 0
+        page.last_scrape_partitions = partition_key(partitions)
+    else:
+        page.last_scrape_max_ads = page.last_scrape_partitions = None
+    db.session.commit()
+    return page_info
+
+async def scrape_and_save_pages(page_ids, max_ads_per_page=None, force=False, partitions=None):
+    """
+    Scrape and save a list of pages, sharing crawls with concurrent jobs
+
+    A page that another job is already crawling with the same partitions
+    and the same or a larger ad cap is not crawled again; this job waits
+    for that crawl instead, and crawls the page itself if that crawl
+    fails. Pages that became fresh since the job was queued are skipped
+    unless force is set.
+
+    Returns:
+        dict: ads_saved, the coalesced and skipped page IDs, and partition
+            coverage per page for partitioned crawls
+    """
+    scraper = FacebookAdsScraper()
+    spec = CrawlSpec(max_ads=max_ads_per_page, partition_key=partition_key(partitions))
+    summary = {'ads_saved': 0, 'coalesced': [], 'skipped': [], 'coverage': {}}
+    waiting = []
+
+    async def crawl(page_id, flight):
+        """Scrape a page this job owns the flight of and publish the result"""
+        page_info = None
+        try:
+            # Another job may have finished this page while we were queued
+            if not force and get_fresh_page_ids([page_id], spec):
+                summary['skipped'].append(page_id)
+                page_info = {'page_id': page_id, 'skipped': True}
+                return
+            page_info = await scrape_and_save_page(scraper, page_id, max_ads_per_page, partitions)
+            summary['ads_saved'] += page_info['ads_saved']
+            if 'partitions' in page_info:
+                summary['coverage'][page_id] = page_info['partitions']
+        finally:
+            page_flights.finish(flight, page_info)
+
+        # Add delay between pages to avoid rate limiting
+        await asyncio.sleep(2)
+
+    for page_id in page_ids:
+        flight, is_owner = page_flights.claim(page_id, spec)
+        if not is_owner:
+            summary['coalesced'].append(page_id)
+            waiting.append((page_id, flight))
+            continue
+        await crawl(page_id, flight)
+
+    # Wait for shared crawls last so our own pages are not held up by them
+    for page_id, flight in waiting:
+        result = await asyncio.to_thread(flight.wait)
+        if result and not result.get('error'):
+            logger.info(f"Page {page_id} was scraped by another job: {result}")
+            continue
+
+        # The shared crawl failed (or its job died), so this job did not get
+        # the page either; crawl it again, or wait for whoever already is
+        error = result.get('error') if result else 'crawl aborted'
+        logger.warning(f"Shared crawl of page {page_id} failed ({error}), scraping it again")
+        summary['coalesced'].remove(page_id)
+        flight, is_owner = page_flights.claim(page_id, spec)
+        if is_owner:
+            await crawl(page_id, flight)
+        else:
+            summary['coalesced'].append(page_id)
+            await asyncio.to_thread(flight.wait)
+
+    return summary
+
+def run_scraping_job(app, job_id, page_ids, max_ads_per_page=None, force=False, partitions=None):
+    """Run scraping job in background, inside an app context of the given app"""
     with app.app_context():
         try:
             # Update job status
@@ -149,52 +430,20 @@ def run_scraping_job(job_id, page_ids, max_ads_per_page=None):
             
             logger.info(f"Starting scraping job {job_id} for {len(page_ids)} pages")
             
-            # Run the async scraper
+            # Run the async scraper, saving ads as they stream in
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-            results = loop.run_until_complete(
-                scrape_facebook_ads(page_ids, max_ads_per_page)
+            summary = loop.run_until_complete(
+                scrape_and_save_pages(page_ids, max_ads_per_page, force, partitions)
             )
             loop.close()
+            total_ads_saved = summary['ads_saved']
             
-            # Process results and save to database
-            total_ads_saved = 0
-            for result in results:
-                page_id = result['page_id']
-                page_name = result['page_name']
-                ads = result['ads']
-                error = result['error']
-                
-                # Create or update page record
-                page = Page.query.filter_by(page_id=page_id).first()
-                if not page:
-                    page = Page(page_id=page_id)
-                    db.session.add(page)
-                
-                page.page_name = page_name or page.page_name
-                page.last_scraped = datetime.utcnow()
-                page.status = 'completed' if not error else 'error'
-                
-                # Save ads
-                if ads:
-                    for ad_data in ads:
-                        # Check if ad already exists
-                        existing_ad = Ad.query.filter_by(library_id=ad_data['library_id']).first()
-                        if not existing_ad:
-                            ad = Ad(
-                                page_id=page_id,
-                                library_id=ad_data['library_id'],
-                                ad_text=ad_data['ad_text'],
-                                media_url=ad_data['media_url'],
-                                media_type=ad_data['media_type'],
-                                start_date=ad_data['start_date'],
-                                cta=ad_data['cta']
-                            )
-                            ad.set_platforms_list(ad_data['platforms'])
-                            db.session.add(ad)
-                            total_ads_saved += 1
-            
-            db.session.commit()
+            job.set_skipped_page_ids_list(job.get_skipped_page_ids_list() + summary['skipped'])
+            job.set_coalesced_page_ids_list(list(dict.fromkeys(
+                job.get_coalesced_page_ids_list() + summary['coalesced']
+            )))
+            job.set_partition_coverage_dict(summary['coverage'])
             
             # Update job status
             job.status = 'completed'
@@ -205,6 +454,7 @@ def run_scraping_job(job_id, page_ids, max_ads_per_page=None):
             
         except Exception as e:
             logger.error(f"Error in scraping job {job_id}: {str(e)}")
+            db.session.rollback()
             
             # Update job with error
             job = ScrapingJob.query.get(job_id)
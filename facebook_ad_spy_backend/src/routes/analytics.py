@@ -0,0 +1,102 @@
+from flask import Blueprint, request, jsonify
+from datetime import date
+from sqlalchemy import func
+from src.models.user import db
+from src.models.ad_rollup import AdDailyRollup, PageLongevityRollup
+import logging
+
+logger = logging.getLogger(__name__)
+
+analytics_bp = Blueprint('analytics', __name__)
+
+def _parse_date_arg(name):
+    """Read an optional YYYY-MM-DD query argument"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name} date '{value}', expected YYYY-MM-DD")
+
+def _filtered_daily_query(*columns):
+    """Query over the daily rollup restricted by page_id / start / end args"""
+    query = db.session.query(*columns)
+    page_id = request.args.get('page_id')
+    start = _parse_date_arg('start')
+    end = _parse_date_arg('end')
+
+    if page_id:
+        query = query.filter(AdDailyRollup.page_id == page_id)
+    if start:
+        query = query.filter(AdDailyRollup.day >= start)
+    if end:
+        query = query.filter(AdDailyRollup.day <= end)
+    return query
+
+@analytics_bp.route('/analytics/new-ads', methods=['GET'])
+def get_new_ads_per_day():
+    """New ads per day, optionally for one page and date window"""
+    try:
+        rows = _filtered_daily_query(
+            AdDailyRollup.day, func.sum(AdDailyRollup.ad_count)
+        ).group_by(AdDailyRollup.day).order_by(AdDailyRollup.day).all()
+
+        return jsonify({
+            'success': True,
+            'series': [{'day': day.isoformat(), 'ad_count': int(count)} for day, count in rows]
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error getting new ads analytics: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@analytics_bp.route('/analytics/mix', methods=['GET'])
+def get_mix():
+    """CTA and platform mix, optionally for one page and date window"""
+    try:
+        cta_rows = _filtered_daily_query(
+            AdDailyRollup.cta, func.sum(AdDailyRollup.ad_count)
+        ).group_by(AdDailyRollup.cta).all()
+        platform_rows = _filtered_daily_query(
+            AdDailyRollup.platforms, func.sum(AdDailyRollup.ad_count)
+        ).group_by(AdDailyRollup.platforms).all()
+
+        # Rollup rows hold platform combinations; an ad on Facebook and
+        # Instagram counts towards both platforms here
+        platforms = {}
+        for combination, count in platform_rows:
+            for platform in (combination.split(',') if combination else ['unknown']):
+                platforms[platform] = platforms.get(platform, 0) + int(count)
+
+        return jsonify({
+            'success': True,
+            'mix': {
+                'cta': {(cta or 'none'): int(count) for cta, count in cta_rows},
+                'platforms': platforms,
+                'platform_combinations': {(combination or 'unknown'): int(count) for combination, count in platform_rows}
+            }
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error getting mix analytics: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@analytics_bp.route('/analytics/longevity', methods=['GET'])
+def get_longevity():
+    """Average and maximum ad lifetime in days per page"""
+    try:
+        query = PageLongevityRollup.query
+        page_id = request.args.get('page_id')
+        if page_id:
+            query = query.filter(PageLongevityRollup.page_id == page_id)
+
+        return jsonify({
+            'success': True,
+            'longevity': [row.to_dict() for row in query.order_by(PageLongevityRollup.page_id).all()]
+        })
+    except Exception as e:
+        logger.error(f"Error getting longevity analytics: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -1,87 +1,293 @@
 import asyncio
+import multiprocessing
+import os
 import re
-from datetime import datetime
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import aclosing
+from dataclasses import dataclass, asdict
+from datetime import datetime, date
+from typing import Optional
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from bs4 import BeautifulSoup
+from src.scraper.partitions import CrawlPartition
 from urllib.parse import urlparse, parse_qs
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@dataclass(slots=True)
+class AdRecord:
+    """A single ad as extracted from the Ads Library"""
+    library_id: str
+    ad_text: Optional[str] = None
+    media_url: Optional[str] = None
+    media_type: Optional[str] = None  # image, video
+    start_date: Optional[date] = None
+    platforms: tuple = ()
+    cta: Optional[str] = None
+
+    def to_dict(self):
+        data = asdict(self)
+        data['platforms'] = list(self.platforms)
+        return data
+
+def _available_cpus():
+    """CPUs this process may run on (respects container/affinity limits)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+# Partition queries of one page crawled at the same time; at least 1, since
+# 0 would leave every partition waiting forever
+PARTITION_CONCURRENCY = max(1, int(os.environ.get('PARTITION_CONCURRENCY', 3)))
+
+# Ads buffered between partition crawlers and the consumer
+PARTITION_QUEUE_SIZE = 100
+
+# Removes ad containers whose Library ID has already been handed out, so the
+# live DOM (and every page.content() snapshot) only holds recent ads
+PRUNE_ADS_SCRIPT = """
+(libraryIds) => {
+    const done = new Set(libraryIds);
+    let removed = 0;
+    for (const container of document.querySelectorAll('div[role="article"]')) {
+        const match = /Library ID:?\\s*(\\d+)/i.exec(container.textContent || '');
+        if (match && done.has(match[1])) {
+            container.remove();
+            removed++;
+        }
+    }
+    return removed;
+}
+"""
+
+# Number of worker processes used for HTML parsing; 0 parses on the event loop
+PARSER_WORKERS = int(os.environ.get('PARSER_WORKERS', _available_cpus()))
+
+_parser_pool = None
+_parser_pool_lock = threading.Lock()
+
+def get_parser_pool():
+    """Return the shared parser process pool, creating it on first use"""
+    global _parser_pool
+    if PARSER_WORKERS <= 0:
+        return None
+    with _parser_pool_lock:
+        if _parser_pool is None:
+            # Scraping jobs run in threads of the Flask process, and forking a
+            # multi-threaded process is unsafe, so workers are spawned fresh
+            _parser_pool = ProcessPoolExecutor(
+                max_workers=PARSER_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            logger.info(f"Started parser pool with {PARSER_WORKERS} workers")
+        return _parser_pool
+
+def reset_parser_pool(broken_pool):
+    """
+    Shut down a broken parser pool; the next get_parser_pool() starts a new one
+    
+    Several scrapes can see the same pool break. Only the pool they actually
+    used is discarded, so a late caller does not tear down the replacement
+    another scrape already started.
+    """
+    global _parser_pool
+    with _parser_pool_lock:
+        if _parser_pool is broken_pool:
+            _parser_pool = None
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
 class FacebookAdsScraper:
     def __init__(self):
         self.base_url = "https://www.facebook.com/ads/library/"
-        self.ads_data = []
         
     async def scrape_page_ads(self, page_id, max_ads=None):
         """
         Scrape all ads for a given Facebook page ID
         
+        Collects iter_page_ads() into a list; prefer iter_page_ads() when the
+        ads can be processed as they arrive.
+        
         Args:
             page_id (str): Facebook page ID
             max_ads (int, optional): Maximum number of ads to scrape
             
         Returns:
-            dict: Contains page_name, page_id, and list of ads
+            dict: Contains page_name, page_id, error and list of ad dicts
+        """
+        page_info = {'page_id': page_id, 'page_name': None, 'error': None}
+        async with aclosing(self.iter_page_ads(page_id, max_ads, page_info)) as ads:
+            page_info['ads'] = [ad.to_dict() async for ad in ads]
+        return page_info
+    
+    async def iter_page_ads(self, page_id, max_ads=None, page_info=None, partition=None):
         """
-        url = f"{self.base_url}?active_status=all&ad_type=all&country=ALL&view_all_page_id={page_id}"
+        Yield ads for a given Facebook page ID as they are discovered
+        
+        Args:
+            page_id (str): Facebook page ID
+            max_ads (int, optional): Maximum number of ads to yield
+            page_info (dict, optional): Filled with 'page_name' and 'error'
+                while the scrape runs, since a generator cannot return them
+            partition (CrawlPartition, optional): Restrict the crawl to one
+                slice of the page's ads; defaults to all of them
+            
+        Yields:
+            AdRecord: Each ad once, in the order it appeared on the page
+        """
+        page_info = self._init_page_info(page_id, page_info)
         
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            )
-            page = await context.new_page()
+            try:
+                async with aclosing(self._iter_ads_in_browser(browser, page_id, max_ads, page_info, partition)) as ads:
+                    async for ad in ads:
+                        yield ad
+            finally:
+                await browser.close()
+    
+    async def iter_partitioned_page_ads(self, page_id, partitions, max_ads=None, page_info=None):
+        """
+        Crawl several Ads Library queries for one page in parallel
+        
+        Each partition is its own scroll session (and its own max_scrolls
+        budget) in a shared browser, so large advertisers are covered more
+        completely than by a single country=ALL query. Ads are merged and
+        deduplicated by library_id as they arrive.
+        
+        Args:
+            page_id (str): Facebook page ID
+            partitions (list): CrawlPartition objects to crawl
+            max_ads (int, optional): Maximum number of unique ads to yield
+            page_info (dict, optional): Filled with 'page_name', 'error' and
+                'partitions', a coverage report keyed by partition label
             
+        Yields:
+            AdRecord: Each unique ad once, in arrival order
+        """
+        page_info = self._init_page_info(page_id, page_info)
+        coverage = page_info['partitions'] = {}
+        queue = asyncio.Queue(maxsize=PARTITION_QUEUE_SIZE)
+        finished = object()
+        semaphore = asyncio.Semaphore(PARTITION_CONCURRENCY)
+        
+        async def crawl(browser, partition):
+            stats = coverage[partition.label] = {
+                'ads': 0, 'new_ads': 0, 'scrolls': 0, 'complete': False, 'error': None
+            }
+            partition_info = self._init_page_info(page_id, None)
             try:
-                logger.info(f"Navigating to Facebook Ads Library for page ID: {page_id}")
-                await page.goto(url, wait_until="networkidle", timeout=30000)
-                
-                # Wait for the page to load
-                await page.wait_for_timeout(3000)
-                
-                # Check if there are any ads
-                no_ads_selector = "text=No ads match your search criteria"
-                try:
-                    await page.wait_for_selector(no_ads_selector, timeout=5000)
-                    logger.info(f"No ads found for page ID: {page_id}")
-                    return {
-                        'page_id': page_id,
-                        'page_name': None,
-                        'ads': [],
-                        'error': 'No ads found'
-                    }
-                except PlaywrightTimeoutError:
-                    # Ads are present, continue scraping
-                    pass
-                
-                # Get page name
-                page_name = await self._extract_page_name(page)
-                logger.info(f"Found page: {page_name}")
-                
-                # Scroll and collect ads
-                ads = await self._scroll_and_collect_ads(page, max_ads)
-                
-                logger.info(f"Scraped {len(ads)} ads for page: {page_name}")
-                
-                return {
-                    'page_id': page_id,
-                    'page_name': page_name,
-                    'ads': ads,
-                    'error': None
-                }
-                
+                async with semaphore:
+                    ads = self._iter_ads_in_browser(browser, page_id, None, partition_info, partition, stats)
+                    async with aclosing(ads):
+                        async for ad in ads:
+                            # Copied now: the task may be cancelled (max_ads)
+                            # before the partition finishes
+                            if partition_info['page_name'] and not page_info['page_name']:
+                                page_info['page_name'] = partition_info['page_name']
+                            stats['ads'] += 1
+                            await queue.put((partition.label, ad))
             except Exception as e:
-                logger.error(f"Error scraping page {page_id}: {str(e)}")
-                return {
-                    'page_id': page_id,
-                    'page_name': None,
-                    'ads': [],
-                    'error': str(e)
-                }
+                partition_info['error'] = str(e)
+            
+            # An empty slice is a complete answer, not a failure
+            if partition_info['error'] == 'No ads found':
+                stats['complete'] = True
+            else:
+                stats['error'] = partition_info['error']
+            if partition_info['page_name'] and not page_info['page_name']:
+                page_info['page_name'] = partition_info['page_name']
+            await queue.put(finished)
+        
+        seen_library_ids = set()
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            tasks = [asyncio.create_task(crawl(browser, partition)) for partition in partitions]
+            try:
+                running = len(tasks)
+                while running:
+                    item = await queue.get()
+                    if item is finished:
+                        running -= 1
+                        continue
+                    label, ad = item
+                    if ad.library_id in seen_library_ids:
+                        continue
+                    seen_library_ids.add(ad.library_id)
+                    coverage[label]['new_ads'] += 1
+                    yield ad
+                    
+                    if max_ads and len(seen_library_ids) >= max_ads:
+                        break
             finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
                 await browser.close()
+        
+        errors = [stats['error'] for stats in coverage.values()]
+        if errors and all(errors):
+            page_info['error'] = errors[0]
+        logger.info(f"Scraped {len(seen_library_ids)} ads for page {page_id} across {len(partitions)} partitions")
+    
+    def _init_page_info(self, page_id, page_info):
+        if page_info is None:
+            page_info = {}
+        page_info.setdefault('page_id', page_id)
+        page_info.setdefault('page_name', None)
+        page_info.setdefault('error', None)
+        return page_info
+    
+    async def _iter_ads_in_browser(self, browser, page_id, max_ads, page_info, partition=None, crawl_stats=None):
+        """Open one Ads Library query in a fresh browser context and stream its ads"""
+        partition = partition or CrawlPartition()
+        url = f"{self.base_url}?{partition.query_string(page_id)}"
+        
+        context = await browser.new_context(
+            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        )
+        page = await context.new_page()
+        
+        try:
+            logger.info(f"Navigating to Facebook Ads Library for page ID: {page_id} ({partition.label})")
+            await page.goto(url, wait_until="networkidle", timeout=30000)
+            
+            # Wait for the page to load
+            await page.wait_for_timeout(3000)
+            
+            # Check if there are any ads
+            no_ads_selector = "text=No ads match your search criteria"
+            try:
+                await page.wait_for_selector(no_ads_selector, timeout=5000)
+                logger.info(f"No ads found for page ID: {page_id} ({partition.label})")
+                page_info['error'] = 'No ads found'
+                return
+            except PlaywrightTimeoutError:
+                # Ads are present, continue scraping
+                pass
+            
+            # Get page name
+            page_name = await self._extract_page_name(page)
+            page_info['page_name'] = page_name
+            logger.info(f"Found page: {page_name}")
+            
+            # Scroll and stream ads
+            ad_count = 0
+            async with aclosing(self._scroll_and_collect_ads(page, max_ads, crawl_stats)) as ads:
+                async for ad in ads:
+                    ad_count += 1
+                    yield ad
+            
+            logger.info(f"Scraped {ad_count} ads for page: {page_name} ({partition.label})")
+            
+        except Exception as e:
+            logger.error(f"Error scraping page {page_id} ({partition.label}): {str(e)}")
+            page_info['error'] = str(e)
+        finally:
+            await context.close()
     
     async def _extract_page_name(self, page):
         """Extract the page name from the ads library page"""
@@ -105,25 +311,34 @@ class FacebookAdsScraper:
                     continue
             
             # Fallback: try to extract from URL or page content
-            content = await page.content()
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Look for any element containing the page name
-            page_links = soup.find_all('a', href=True)
-            for link in page_links:
-                if 'facebook.com' in link.get('href', '') and link.text.strip():
-                    return link.text.strip()
-            
-            return "Unknown Page"
+            page_name = await self._parse_html(parse_page_name_html, await page.content())
+            return page_name or "Unknown Page"
             
         except Exception as e:
             logger.warning(f"Could not extract page name: {str(e)}")
             return "Unknown Page"
     
-    async def _scroll_and_collect_ads(self, page, max_ads=None):
-        """Scroll through the page and collect all ad data"""
-        ads = []
-        last_ad_count = 0
+    async def _scroll_and_collect_ads(self, page, max_ads=None, crawl_stats=None):
+        """
+        Scroll through the page and yield each new ad as it appears
+        
+        crawl_stats, if given, receives the number of scrolls and whether
+        the results were exhausted ('complete') rather than cut off by
+        max_scrolls or max_ads.
+        """
+        if crawl_stats is None:
+            crawl_stats = {}
+        crawl_stats['scrolls'] = 0
+        crawl_stats['complete'] = False
+        # Only library IDs are kept between scrolls; ads themselves are
+        # handed to the caller straight away and their containers pruned
+        # from the page once newer ones have loaded, so neither the DOM nor
+        # the HTML parsed per scroll grows with the ads already collected.
+        # The newest containers stay rendered: if they vanish too, the page
+        # stopped rendering results rather than running out of them.
+        seen_library_ids = set()
+        prune_next = []
+        pruned = 0
         no_new_ads_count = 0
         max_scrolls = 50  # Prevent infinite scrolling
         scroll_count = 0
@@ -132,154 +347,242 @@ class FacebookAdsScraper:
             # Extract ads from current viewport
             current_ads = await self._extract_ads_from_page(page)
             
-            # Add new ads (avoid duplicates by library_id)
-            existing_library_ids = {ad['library_id'] for ad in ads}
-            new_ads = [ad for ad in current_ads if ad['library_id'] not in existing_library_ids]
-            ads.extend(new_ads)
+            # Yield new ads (avoid duplicates by library_id)
+            new_library_ids = []
+            for ad in current_ads:
+                if ad.library_id in seen_library_ids:
+                    continue
+                seen_library_ids.add(ad.library_id)
+                new_library_ids.append(ad.library_id)
+                yield ad
+                
+                # Check if we've reached the maximum
+                if max_ads and len(seen_library_ids) >= max_ads:
+                    return
+            new_ad_count = len(new_library_ids)
+            if new_ad_count:
+                pruned += await self._prune_collected_ads(page, prune_next)
+                prune_next = new_library_ids
+            containers_left = len(current_ads)
+            del current_ads
             
-            logger.info(f"Scroll {scroll_count + 1}: Found {len(new_ads)} new ads, total: {len(ads)}")
-            
-            # Check if we've reached the maximum
-            if max_ads and len(ads) >= max_ads:
-                ads = ads[:max_ads]
-                break
+            logger.info(f"Scroll {scroll_count + 1}: Found {new_ad_count} new ads, total: {len(seen_library_ids)}")
             
             # Check if we're getting new ads
-            if len(ads) == last_ad_count:
+            if new_ad_count == 0:
                 no_new_ads_count += 1
                 if no_new_ads_count >= 3:  # Stop if no new ads for 3 scrolls
                     logger.info("No new ads found after 3 scrolls, stopping")
+                    if pruned and not containers_left:
+                        # Even the unpruned containers are gone, so the page
+                        # likely broke after our DOM edits; do not trust it
+                        logger.warning("No ad containers left on the page after pruning, "
+                                       "not marking the crawl complete")
+                    else:
+                        crawl_stats['complete'] = True
                     break
             else:
                 no_new_ads_count = 0
-                last_ad_count = len(ads)
             
             # Scroll down
             await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
             await page.wait_for_timeout(2000)  # Wait for new content to load
             
             scroll_count += 1
-        
-        return ads
+            crawl_stats['scrolls'] = scroll_count
+    
+    async def _prune_collected_ads(self, page, library_ids):
+        """Remove the containers of already collected ads from the live page
+
+        Returns:
+            int: Number of containers removed
+        """
+        if not library_ids:
+            return 0
+        try:
+            removed = await page.evaluate(PRUNE_ADS_SCRIPT, library_ids)
+            logger.info(f"Pruned {removed} collected ad containers")
+            return removed
+        except Exception as e:
+            # Pruning only saves memory; a failure must not stop the crawl
+            logger.warning(f"Error pruning collected ads from page: {str(e)}")
+            return 0
     
     async def _extract_ads_from_page(self, page):
         """Extract ad data from the current page content"""
-        ads = []
-        
         try:
-            content = await page.content()
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Find ad containers - these may vary based on Facebook's current structure
-            ad_containers = soup.find_all('div', {'role': 'article'}) or \
-                           soup.find_all('div', class_=re.compile(r'.*ad.*', re.I)) or \
-                           soup.find_all('div', attrs={'data-testid': re.compile(r'.*ad.*', re.I)})
-            
-            if not ad_containers:
-                # Fallback: look for any div containing "Library ID"
-                ad_containers = soup.find_all('div', string=re.compile(r'Library ID', re.I))
-                ad_containers = [container.find_parent('div') for container in ad_containers if container.find_parent('div')]
-            
-            for container in ad_containers:
-                ad_data = self._extract_ad_data_from_container(container)
-                if ad_data and ad_data['library_id']:
-                    ads.append(ad_data)
-            
-            # Remove duplicates based on library_id
-            seen_ids = set()
-            unique_ads = []
-            for ad in ads:
-                if ad['library_id'] not in seen_ids:
-                    seen_ids.add(ad['library_id'])
-                    unique_ads.append(ad)
-            
-            return unique_ads
-            
+            return await self._parse_html(parse_ads_html, await page.content())
         except Exception as e:
             logger.error(f"Error extracting ads from page: {str(e)}")
             return []
     
-    def _extract_ad_data_from_container(self, container):
-        """Extract individual ad data from a container element"""
+    async def _parse_html(self, parse, html):
+        """Run a module-level parse function over page HTML in the parser pool"""
+        pool = get_parser_pool()
+        if pool is None:
+            return parse(html)
         try:
-            ad_data = {
-                'library_id': None,
-                'ad_text': None,
-                'media_url': None,
-                'media_type': None,
-                'start_date': None,
-                'platforms': [],
-                'cta': None
-            }
-            
-            # Extract Library ID
-            library_id_text = container.find(string=re.compile(r'Library ID:?\s*(\d+)', re.I))
-            if library_id_text:
-                match = re.search(r'Library ID:?\s*(\d+)', library_id_text, re.I)
+            # Parsing is CPU-bound, so it runs in a worker process to keep the
+            # event loop free for Playwright traffic of other pages
+            return await asyncio.get_running_loop().run_in_executor(pool, parse, html)
+        except BrokenProcessPool as e:
+            logger.warning(f"Parser pool died, parsing in-process: {str(e)}")
+            reset_parser_pool(pool)
+            return parse(html)
+
+def parse_ads_html(html):
+    """
+    Parse a serialized Ads Library page into AdRecords
+    
+    Module-level so it can be sent to parser worker processes.
+    
+    Args:
+        html (str): Page HTML as returned by page.content()
+        
+    Returns:
+        list: Unique AdRecord objects in page order
+    """
+    ads = []
+    soup = None
+    
+    try:
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Find ad containers - these may vary based on Facebook's current structure
+        ad_containers = soup.find_all('div', {'role': 'article'}) or \
+                       soup.find_all('div', class_=re.compile(r'.*ad.*', re.I)) or \
+                       soup.find_all('div', attrs={'data-testid': re.compile(r'.*ad.*', re.I)})
+        
+        if not ad_containers:
+            # Fallback: look for any div containing "Library ID"
+            ad_containers = soup.find_all('div', string=re.compile(r'Library ID', re.I))
+            ad_containers = [container.find_parent('div') for container in ad_containers if container.find_parent('div')]
+        
+        for container in ad_containers:
+            ad = extract_ad_from_container(container)
+            if ad:
+                ads.append(ad)
+        
+        # Remove duplicates based on library_id
+        seen_ids = set()
+        unique_ads = []
+        for ad in ads:
+            if ad.library_id not in seen_ids:
+                seen_ids.add(ad.library_id)
+                unique_ads.append(ad)
+        
+        return unique_ads
+        
+    except Exception as e:
+        logger.error(f"Error extracting ads from page: {str(e)}")
+        return []
+    finally:
+        # Records hold plain strings only, so the tree can go right away
+        # instead of living until the next scroll
+        if soup is not None:
+            soup.decompose()
+
+def parse_page_name_html(html):
+    """
+    Find the page name in a serialized Ads Library page, or None
+    
+    Module-level so it can be sent to parser worker processes.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    try:
+        # Look for any element containing the page name
+        page_links = soup.find_all('a', href=True)
+        for link in page_links:
+            if 'facebook.com' in link.get('href', '') and link.text.strip():
+                return link.text.strip()
+        return None
+    finally:
+        soup.decompose()
+
+def extract_ad_from_container(container):
+    """Extract an AdRecord from a container element, or None without a Library ID"""
+    try:
+        ad_data = {
+            'library_id': None,
+            'ad_text': None,
+            'media_url': None,
+            'media_type': None,
+            'start_date': None,
+            'platforms': [],
+            'cta': None
+        }
+        
+        # Extract Library ID
+        library_id_text = container.find(string=re.compile(r'Library ID:?\s*(\d+)', re.I))
+        if library_id_text:
+            match = re.search(r'Library ID:?\s*(\d+)', library_id_text, re.I)
+            if match:
+                ad_data['library_id'] = match.group(1)
+        
+        # Extract ad text
+        text_elements = container.find_all(['p', 'div', 'span'], string=True)
+        for element in text_elements:
+            text = element.get_text(strip=True)
+            if text and len(text) > 20 and 'Library ID' not in text and 'Started running' not in text:
+                ad_data['ad_text'] = text
+                break
+        
+        # Extract start date
+        date_text = container.find(string=re.compile(r'Started running on', re.I))
+        if date_text:
+            match = re.search(r'Started running on\s+([A-Za-z]+\s+\d+,\s+\d+)', date_text, re.I)
+            if match:
+                try:
+                    date_str = match.group(1)
+                    ad_data['start_date'] = datetime.strptime(date_str, '%b %d, %Y').date()
+                except ValueError:
+                    pass
+        
+        # Extract media URL
+        img_tags = container.find_all('img', src=True)
+        video_tags = container.find_all('video', src=True)
+        
+        if img_tags:
+            # Find the largest image (likely the ad creative)
+            largest_img = max(img_tags, key=lambda img: len(img.get('src', '')))
+            ad_data['media_url'] = largest_img.get('src')
+            ad_data['media_type'] = 'image'
+        elif video_tags:
+            ad_data['media_url'] = video_tags[0].get('src')
+            ad_data['media_type'] = 'video'
+        
+        # Extract platforms
+        platform_text = container.find(string=re.compile(r'Platforms?', re.I))
+        if platform_text:
+            # Look for platform indicators
+            if 'Facebook' in str(container):
+                ad_data['platforms'].append('Facebook')
+            if 'Instagram' in str(container):
+                ad_data['platforms'].append('Instagram')
+        
+        # Extract CTA (Call to Action) - look for common CTA patterns
+        cta_patterns = [
+            r'(Learn More|Shop Now|Sign Up|Download|Get Started|Book Now|Call Now|Contact Us|Visit Website)',
+            r'(Mehr erfahren|Jetzt kaufen|Registrieren|Herunterladen)',  # German
+            r'(En savoir plus|Acheter maintenant|S\'inscrire|Télécharger)'  # French
+        ]
+        
+        for pattern in cta_patterns:
+            cta_match = container.find(string=re.compile(pattern, re.I))
+            if cta_match:
+                match = re.search(pattern, cta_match, re.I)
                 if match:
-                    ad_data['library_id'] = match.group(1)
-            
-            # Extract ad text
-            text_elements = container.find_all(['p', 'div', 'span'], string=True)
-            for element in text_elements:
-                text = element.get_text(strip=True)
-                if text and len(text) > 20 and 'Library ID' not in text and 'Started running' not in text:
-                    ad_data['ad_text'] = text
+                    ad_data['cta'] = match.group(1)
                     break
-            
-            # Extract start date
-            date_text = container.find(string=re.compile(r'Started running on', re.I))
-            if date_text:
-                match = re.search(r'Started running on\s+([A-Za-z]+\s+\d+,\s+\d+)', date_text, re.I)
-                if match:
-                    try:
-                        date_str = match.group(1)
-                        ad_data['start_date'] = datetime.strptime(date_str, '%b %d, %Y').date()
-                    except ValueError:
-                        pass
-            
-            # Extract media URL
-            img_tags = container.find_all('img', src=True)
-            video_tags = container.find_all('video', src=True)
-            
-            if img_tags:
-                # Find the largest image (likely the ad creative)
-                largest_img = max(img_tags, key=lambda img: len(img.get('src', '')))
-                ad_data['media_url'] = largest_img.get('src')
-                ad_data['media_type'] = 'image'
-            elif video_tags:
-                ad_data['media_url'] = video_tags[0].get('src')
-                ad_data['media_type'] = 'video'
-            
-            # Extract platforms
-            platform_text = container.find(string=re.compile(r'Platforms?', re.I))
-            if platform_text:
-                # Look for platform indicators
-                if 'Facebook' in str(container):
-                    ad_data['platforms'].append('Facebook')
-                if 'Instagram' in str(container):
-                    ad_data['platforms'].append('Instagram')
-            
-            # Extract CTA (Call to Action) - look for common CTA patterns
-            cta_patterns = [
-                r'(Learn More|Shop Now|Sign Up|Download|Get Started|Book Now|Call Now|Contact Us|Visit Website)',
-                r'(Mehr erfahren|Jetzt kaufen|Registrieren|Herunterladen)',  # German
-                r'(En savoir plus|Acheter maintenant|S\'inscrire|Télécharger)'  # French
-            ]
-            
-            for pattern in cta_patterns:
-                cta_match = container.find(string=re.compile(pattern, re.I))
-                if cta_match:
-                    match = re.search(pattern, cta_match, re.I)
-                    if match:
-                        ad_data['cta'] = match.group(1)
-                        break
-            
-            return ad_data if ad_data['library_id'] else None
-            
-        except Exception as e:
-            logger.error(f"Error extracting ad data from container: {str(e)}")
+        
+        if not ad_data['library_id']:
             return None
+        ad_data['platforms'] = tuple(ad_data['platforms'])
+        return AdRecord(**ad_data)
+    
+    except Exception as e:
+        logger.error(f"Error extracting ad data from container: {str(e)}")
+        return None
 
 # Async function to run the scraper
 async def scrape_facebook_ads(page_ids, max_ads_per_page=None):
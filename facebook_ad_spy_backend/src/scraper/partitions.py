@@ -0,0 +1,156 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import product
+from typing import Optional
+from urllib.parse import urlencode
+
+# Values that split the Ads Library into non-overlapping result sets
+ACTIVE_STATUSES = ('active', 'inactive')
+MEDIA_TYPES = ('image', 'video', 'meme', 'none')
+
+PARTITION_DIMENSIONS = ('active_status', 'media_type', 'country', 'date')
+
+# Upper bound on queries per page, to keep a bad request from launching hundreds of crawls
+MAX_PARTITIONS = 200
+
+@dataclass(frozen=True, slots=True)
+class CrawlPartition:
+    """One Ads Library query covering a slice of a page's ads"""
+    active_status: str = 'all'
+    country: str = 'ALL'
+    media_type: str = 'all'
+    start_date_min: Optional[date] = None
+    start_date_max: Optional[date] = None
+
+    @property
+    def label(self):
+        """Short human-readable name, used as the key in coverage reports"""
+        parts = []
+        if self.active_status != 'all':
+            parts.append(self.active_status)
+        if self.country != 'ALL':
+            parts.append(self.country)
+        if self.media_type != 'all':
+            parts.append(self.media_type)
+        if self.start_date_min or self.start_date_max:
+            start = self.start_date_min.isoformat() if self.start_date_min else '...'
+            end = self.start_date_max.isoformat() if self.start_date_max else '...'
+            parts.append(f'{start}..{end}')
+        return '/'.join(parts) or 'all'
+
+    def query_string(self, page_id):
+        """Ads Library query string for this slice of page_id's ads"""
+        params = {
+            'active_status': self.active_status,
+            'ad_type': 'all',
+            'country': self.country,
+            'media_type': self.media_type,
+        }
+        if self.start_date_min:
+            params['start_date[min]'] = self.start_date_min.isoformat()
+        if self.start_date_max:
+            params['start_date[max]'] = self.start_date_max.isoformat()
+        params['view_all_page_id'] = page_id
+        return urlencode(params)
+
+def date_windows(start_date, window_days, today=None):
+    """
+    Split all time into consecutive start-date windows
+
+    Everything before start_date is one open-ended window and the last
+    window runs open-ended past today, so together they cover every ad.
+
+    Returns:
+        list: (min_date, max_date) tuples, None meaning unbounded
+    """
+    today = today or date.today()
+    step = timedelta(days=window_days)
+    windows = [(None, start_date - timedelta(days=1))]
+    current = start_date
+    while current + step <= today:
+        windows.append((current, current + step - timedelta(days=1)))
+        current += step
+    windows.append((current, None))
+    return windows
+
+def build_partitions(by, countries=None, start_date=None, window_days=30):
+    """
+    Build the cross product of the requested partition dimensions
+
+    Active status, media type and date windows split a page's ads into
+    disjoint sets. Countries can overlap (one ad may run in several), which
+    the crawler handles by deduplicating on library_id.
+
+    Args:
+        by (list): Dimensions to split on, from PARTITION_DIMENSIONS
+        countries (list, optional): Country codes, required for 'country'
+        start_date (str or date, optional): First day of the dated windows
+            for 'date'; defaults to one year ago
+        window_days (int): Size of each date window
+
+    Returns:
+        list: CrawlPartition objects
+
+    Raises:
+        ValueError: If the dimensions or their options are invalid
+    """
+    # A bare string would otherwise be split into single characters
+    if by is not None and not isinstance(by, (list, tuple)):
+        raise ValueError(f"Partition 'by' must be a list, e.g. [\"media_type\"], not {by!r}")
+    if countries is not None and not isinstance(countries, (list, tuple)):
+        raise ValueError(f"Partition 'countries' must be a list, e.g. [\"US\", \"GB\"], not {countries!r}")
+    by = list(dict.fromkeys(by or []))
+    unknown = [dimension for dimension in by if dimension not in PARTITION_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown partition dimensions: {', '.join(unknown)}")
+    if not by:
+        raise ValueError(f"Partition 'by' must list at least one of: {', '.join(PARTITION_DIMENSIONS)}")
+
+    axes = []
+    if 'active_status' in by:
+        axes.append([{'active_status': status} for status in ACTIVE_STATUSES])
+    if 'media_type' in by:
+        axes.append([{'media_type': media_type} for media_type in MEDIA_TYPES])
+    if 'country' in by:
+        if not countries:
+            raise ValueError("Partitioning by country requires a 'countries' list")
+        axes.append([{'country': str(country).upper()} for country in dict.fromkeys(countries)])
+    if 'date' in by:
+        if isinstance(start_date, str):
+            try:
+                start_date = date.fromisoformat(start_date)
+            except ValueError:
+                raise ValueError(f"Invalid start_date '{start_date}', expected YYYY-MM-DD")
+        start_date = start_date or date.today() - timedelta(days=365)
+        if int(window_days) < 1:
+            raise ValueError("window_days must be at least 1")
+        axes.append([
+            {'start_date_min': window_min, 'start_date_max': window_max}
+            for window_min, window_max in date_windows(start_date, int(window_days))
+        ])
+
+    partition_count = 1
+    for axis in axes:
+        partition_count *= len(axis)
+    if partition_count > MAX_PARTITIONS:
+        raise ValueError(f"Partitioning would create {partition_count} queries per page (max {MAX_PARTITIONS})")
+
+    partitions = []
+    for combination in product(*axes):
+        fields = {}
+        for part in combination:
+            fields.update(part)
+        partitions.append(CrawlPartition(**fields))
+    return partitions
+
+def partition_key(partitions):
+    """
+    Stable identifier of a partition set, None for an unpartitioned crawl
+
+    Two crawls with the same key ran the same Ads Library queries.
+    """
+    if not partitions:
+        return None
+    queries = sorted(partition.query_string('') for partition in partitions)
+    return hashlib.sha1('\n'.join(queries).encode()).hexdigest()
@@ -0,0 +1,93 @@
+import threading
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True, slots=True)
+class CrawlSpec:
+    """The parameters of a page crawl that decide which ads it collects"""
+    max_ads: Optional[int] = None  # None crawls every ad
+    partition_key: Optional[str] = None  # see partitions.partition_key()
+
+    def covers(self, other):
+        """Whether a crawl with this spec collects everything `other` asks for"""
+        # Different partitionings run different queries (country partitions
+        # only see the listed countries), so they never stand in for each other
+        if self.partition_key != other.partition_key:
+            return False
+        if self.max_ads is None:
+            return True
+        # Both crawls take ads in page order, so a larger cap includes a smaller one
+        return other.max_ads is not None and other.max_ads <= self.max_ads
+
+class _Flight:
+    """One in-progress scrape of a page that other jobs can wait on"""
+
+    def __init__(self, page_id, spec):
+        self.page_id = page_id
+        self.spec = spec
+        self.done = threading.Event()
+        self.result = None
+
+    def wait(self):
+        """Block until the owning job finishes; returns its page result"""
+        self.done.wait()
+        return self.result
+
+class PageScrapeFlights:
+    """
+    Single-flight registry of pages currently being scraped
+
+    Scraping jobs run in separate threads with their own event loops, so
+    this is guarded by a threading lock rather than asyncio primitives. The
+    first job to claim a page_id owns the crawl; later claims whose spec the
+    running crawl covers get the same flight back and wait for its result
+    instead of crawling again. A claim asking for more (e.g. no ad cap while
+    a capped crawl runs) starts its own flight for the page.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def _covering_flight(self, page_id, spec):
+        for flight in self._flights.get(page_id, ()):
+            if flight.spec.covers(spec):
+                return flight
+        return None
+
+    def claim(self, page_id, spec=CrawlSpec()):
+        """
+        Claim a page for scraping
+
+        Returns:
+            tuple: (flight, is_owner). Owners must call finish() when done.
+        """
+        with self._lock:
+            flight = self._covering_flight(page_id, spec)
+            if flight:
+                return flight, False
+            flight = _Flight(page_id, spec)
+            self._flights.setdefault(page_id, []).append(flight)
+            return flight, True
+
+    def finish(self, flight, result):
+        """Publish the owner's result and release the page"""
+        with self._lock:
+            flights = self._flights.get(flight.page_id, [])
+            if flight in flights:
+                flights.remove(flight)
+            if not flights:
+                self._flights.pop(flight.page_id, None)
+        flight.result = result
+        flight.done.set()
+
+    def in_flight(self, page_ids, spec=CrawlSpec()):
+        """Subset of page_ids currently being scraped by a crawl covering spec"""
+        with self._lock:
+            return [page_id for page_id in page_ids if self._covering_flight(page_id, spec)]
+
+# Shared by every scraping job in this process
+page_flights = PageScrapeFlights()